@@ -1,13 +1,36 @@
 # agents/weather_agent.py
+import asyncio
+import logging
+import re
+
+import orjson
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from langchain_core.tools import BaseTool
 
 from prompts.system_prompts import get_tool_prompt
 from tools.forecast_tools import get_forecast
-from tools.weather_tools import city_to_coords, get_current_weather
-from settings import Settings
+from tools.weather_tools import city_to_coords, get_weather_for_city
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Safety limits for the tool-calling loop, per message
+MAX_ITERATIONS = 5
+MAX_TOKENS_PER_MESSAGE = 50_000
+FALLBACK_REPLY = "I encountered an issue processing your request. Please try again."
+
+# ainvoke_batch limits: messages per batch, and LLM calls in flight at once
+MAX_BATCH_SIZE = 100
+MAX_BATCH_CONCURRENCY = 8
+
+# Messages made up only of greetings/thanks/acknowledgements skip the tool loop
+_CHIT_CHAT_RE = re.compile(
+    r"^\s*(?:(?:hi|hello|hey|hiya|yo|thanks|thank\s+you|thx|ty|ok|okay|cool|great|bye|goodbye|"
+    r"good\s+(?:morning|afternoon|evening|night))[\s!.,?]*)+$",
+    re.IGNORECASE,
+)
 
 
 class WeatherAgent:
@@ -16,7 +39,7 @@ class WeatherAgent:
     """
     
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
         
         # Initialize Gemini LLM
         self.llm = ChatGoogleGenerativeAI(
@@ -25,81 +48,246 @@ class WeatherAgent:
             temperature=0.1,
         )
         
-        # Available tools
-        self.tools: List[BaseTool] = [city_to_coords, get_current_weather, get_forecast]
+        # Cheaper model for chit-chat; no tools bound, so no tool schemas are sent
+        self.llm_simple = ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash-lite",
+            google_api_key=settings.google_api_key,
+            temperature=0.1,
+        )
+        
+        # Available tools. get_weather_for_city covers the common "weather in X"
+        # query in one call; city_to_coords stays for forecast lookups.
+        self.tools: List[BaseTool] = [get_weather_for_city, city_to_coords, get_forecast]
         
-        # Create tool map for execution
-        self.tool_map = {tool.name: tool for tool in self.tools}
+        # Tool name -> bound ainvoke, resolved once for execution
+        self._dispatch = {tool.name: tool.ainvoke for tool in self.tools}
         
         # Bind tools to LLM
         self.llm_with_tools = self.llm.bind_tools(self.tools)
         
-        # Concise system prompt (minimal tokens)
-        self.system_prompt = "You are a helpful weather assistant. Provide clear, concise weather information. Ask for clarification if location is unclear."
+        # Concise system prompt (minimal tokens), with the per-tool guidance
+        # folded in once instead of injected after every tool result
+        self.system_prompt = "\n\n".join(
+            ["You are a helpful weather assistant. Provide clear, concise weather information. Ask for clarification if location is unclear."]
+            + [get_tool_prompt(tool.name) for tool in self.tools]
+        )
+        self.system_message = SystemMessage(content=self.system_prompt)
+        self.simple_system_message = SystemMessage(
+            content="You are a friendly weather assistant. Reply in one short sentence."
+        )
+    
+    @staticmethod
+    def _classify(message: str) -> str:
+        """Return "simple" for pure chit-chat, otherwise "weather"."""
+        return "simple" if _CHIT_CHAT_RE.match(message) else "weather"
+    
+    async def _call_tool(self, tool_call: dict) -> object:
+        try:
+            run = self._dispatch[tool_call["name"]]
+        except KeyError:
+            # Answer every call so the conversation history stays well-formed
+            return {"error": f"Unknown tool '{tool_call['name']}'"}
+        try:
+            return await run(tool_call["args"])
+        except Exception as e:
+            # Keep a failing tool (bad args, upstream error) from failing the
+            # whole turn, or every conversation in a batch
+            return {"error": f"Tool '{tool_call['name']}' failed: {str(e)}"}
+    
+    async def _run_tool_calls(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        """
+        Execute tool calls concurrently; they are independent within a turn.
+        Returns one ToolMessage per call, in call order.
+        """
+        results = await asyncio.gather(
+            *(self._call_tool(tool_call) for tool_call in tool_calls)
+        )
+        
+        tool_messages = []
+        for tool_call, result in zip(tool_calls, results):
+            logger.debug("result: %s", result)
+            tool_messages.append(
+                ToolMessage(
+                    # Compact JSON: unambiguous for the LLM and fewer tokens than a dict repr
+                    content=orjson.dumps(result, default=str).decode(),
+                    tool_call_id=tool_call["id"]
+                )
+            )
+        return tool_messages
+    
+    @staticmethod
+    def _token_usage(input_tokens: int, output_tokens: int) -> Dict[str, int]:
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
     
-    async def invoke(self, message: str) -> str:
+    async def invoke(self, message: str) -> Tuple[AIMessage, Dict[str, int]]:
         """
         Send a message to the agent and get a response.
         Handles tool execution loop.
+        Returns the final AIMessage and the token usage summed over all LLM turns.
         """
-        messages = [
-            SystemMessage(content=self.system_prompt),
-            HumanMessage(content=message)
-        ]
+        if self._classify(message) == "simple":
+            response = await self.llm_simple.ainvoke(
+                [self.simple_system_message, HumanMessage(content=message)]
+            )
+            usage = response.usage_metadata
+            return response, self._token_usage(usage['input_tokens'], usage['output_tokens'])
+        
+        messages = [self.system_message, HumanMessage(content=message)]
         
-        # Loop to handle tool calls
-        input_Tokens = 0
-        output_Tokens = 0
-        total_Tokens = 0
+        # Loop to handle tool calls, bounded by iteration and token budgets
+        input_tokens = 0
+        output_tokens = 0
         
-        while True:
+        for iteration in range(MAX_ITERATIONS):
             response = await self.llm_with_tools.ainvoke(messages)
 
             # token accumulation
-            input_Tokens += response.usage_metadata['input_tokens']
-            output_Tokens += response.usage_metadata['output_tokens']
-            total_Tokens += response.usage_metadata['total_tokens']
+            usage = response.usage_metadata
+            input_tokens += usage['input_tokens']
+            output_tokens += usage['output_tokens']
             
-            print("Tool", response.tool_calls)
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=message),
-                response
-            ]
+            logger.debug("tool calls: %s", response.tool_calls)
+            messages.append(response)
             
             # Check if LLM wants to call tools
             if not response.tool_calls:
                 # No more tool calls, return final answer
-                print(input_Tokens, output_Tokens, total_Tokens)
-                return response
+                token_usage = self._token_usage(input_tokens, output_tokens)
+                logger.debug("token usage: %s", token_usage)
+                return response, token_usage
             
-            # Execute each tool call
-            for tool_call in response.tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"]
-                tool_id = tool_call["id"]
-                
-                # Get and execute the tool
-                tool = self.tool_map.get(tool_name)
-                if tool:
-                    result = await tool.ainvoke(tool_args)
-                    print("result:", result)
-
-                    # Get tool-specific system prompt
-                    tool_context = get_tool_prompt(tool_name)
-
-                    # Inject system prompt for next LLM call
-                    messages.append(
-                        SystemMessage(content=tool_context)
-                    )
-                    # Add tool result to messages
-                    messages.append(
-                        ToolMessage(
-                            content=str(result),
-                            tool_call_id=tool_id
-                        )
-                    )
-
+            # No LLM turn would follow these tool results, so don't run them
+            last_turn = iteration == MAX_ITERATIONS - 1
+            if last_turn or input_tokens + output_tokens > MAX_TOKENS_PER_MESSAGE:
+                break
+            
+            # Execute the tool calls and add their results to messages
+            messages.extend(await self._run_tool_calls(response.tool_calls))
+        
+        # Out of iterations or token budget
+        token_usage = self._token_usage(input_tokens, output_tokens)
+        logger.warning("tool loop stopped without a final answer; token usage: %s", token_usage)
+        return AIMessage(content=FALLBACK_REPLY), token_usage
+    
+    async def astream(self, message: str) -> AsyncIterator[str]:
+        """
+        Like invoke(), but yields the answer text in chunks.
+        Each turn's text is held back until the turn is known to carry no tool
+        calls, so narration before a tool call never reaches the caller and the
+        output matches invoke().
+        """
+        if self._classify(message) == "simple":
+            async for chunk in self.llm_simple.astream(
+                [self.simple_system_message, HumanMessage(content=message)]
+            ):
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
+            return
+        
+        messages = [self.system_message, HumanMessage(content=message)]
+        tokens_used = 0
+        
+        for iteration in range(MAX_ITERATIONS):
+            # Merge the chunks to recover tool calls and usage for this turn
+            response = None
+            text_chunks = []
+            async for chunk in self.llm_with_tools.astream(messages):
+                response = chunk if response is None else response + chunk
+                if isinstance(chunk.content, str) and chunk.content:
+                    text_chunks.append(chunk.content)
+            
+            if response is None:
+                break
+            messages.append(response)
+            if not response.tool_calls:
+                # Final answer: release the buffered text
+                for text in text_chunks:
+                    yield text
+                return
+            
+            usage = response.usage_metadata or {}
+            tokens_used += usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+            last_turn = iteration == MAX_ITERATIONS - 1
+            if last_turn or tokens_used > MAX_TOKENS_PER_MESSAGE:
+                break
+            
+            messages.extend(await self._run_tool_calls(response.tool_calls))
+        
+        logger.warning("streamed tool loop stopped without a final answer")
+        yield FALLBACK_REPLY
+    
+    async def ainvoke_batch(self, messages: List[str]) -> List[AIMessage]:
+        """
+        Process several independent messages together.
+        Each LLM turn is sent as one batch, and the tool calls of every
+        conversation in that turn run concurrently.
+        """
+        responses: List[Optional[AIMessage]] = [None] * len(messages)
+        # Bound the fan-out to Gemini, and get failures back per item so one
+        # failed call doesn't discard the rest of the batch
+        batch_kwargs = {
+            "config": {"max_concurrency": MAX_BATCH_CONCURRENCY},
+            "return_exceptions": True,
+        }
+        
+        simple = [i for i, message in enumerate(messages) if self._classify(message) == "simple"]
+        if simple:
+            simple_responses = await self.llm_simple.abatch(
+                [[self.simple_system_message, HumanMessage(content=messages[i])] for i in simple],
+                **batch_kwargs,
+            )
+            for i, response in zip(simple, simple_responses):
+                if isinstance(response, Exception):
+                    logger.warning("batch item %d failed: %s", i, response)
+                    response = AIMessage(content=FALLBACK_REPLY)
+                responses[i] = response
+        
+        # Conversations still waiting on the LLM, keyed by input position
+        pending = {
+            i: [self.system_message, HumanMessage(content=message)]
+            for i, message in enumerate(messages)
+            if responses[i] is None
+        }
+        
+        tokens_used = dict.fromkeys(pending, 0)
+        
+        for iteration in range(MAX_ITERATIONS):
+            if not pending:
+                break
+            last_turn = iteration == MAX_ITERATIONS - 1
+            indices = list(pending)
+            turn = await self.llm_with_tools.abatch(
+                [pending[i] for i in indices], **batch_kwargs
+            )
+            
+            with_tools = []
+            for i, response in zip(indices, turn):
+                if isinstance(response, Exception):
+                    logger.warning("batch item %d failed: %s", i, response)
+                    responses[i] = AIMessage(content=FALLBACK_REPLY)
+                    del pending[i]
+                    continue
+                usage = response.usage_metadata
+                tokens_used[i] += usage['input_tokens'] + usage['output_tokens']
+                pending[i].append(response)
+                if not response.tool_calls:
+                    responses[i] = response
+                    del pending[i]
+                elif last_turn or tokens_used[i] > MAX_TOKENS_PER_MESSAGE:
+                    # Out of budget: skip tools whose results no LLM turn would use
+                    responses[i] = AIMessage(content=FALLBACK_REPLY)
+                    del pending[i]
+                else:
+                    with_tools.append(i)
+            
+            tool_results = await asyncio.gather(
+                *(self._run_tool_calls(pending[i][-1].tool_calls) for i in with_tools)
+            )
+            for i, tool_messages in zip(with_tools, tool_results):
+                pending[i].extend(tool_messages)
         
-        # If we hit max iterations, return last response
-        return "I encountered an issue processing your request. Please try again."
+        return responses
@@ -1,10 +1,78 @@
 # clients/openweather.py
 import asyncio
-from typing import Any, Dict, List, Optional
+import logging
+import random
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
 import httpx
 
-from settings import Settings
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Jitter source for retry backoff; SystemRandom is safe to share across threads
+_jitter = random.SystemRandom()
+
+def _build_http_client() -> httpx.AsyncClient:
+    # HTTP/2 lets concurrent tool calls multiplex over one TLS connection,
+    # and a long keep-alive avoids re-handshaking between chat turns.
+    return httpx.AsyncClient(
+        headers={"User-Agent": "weather-info-agent/0.1"},
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=50,
+            max_keepalive_connections=20,
+            keepalive_expiry=60.0,
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_default_openweather_client() -> "OpenWeatherClient":
+    """
+    Return the process-wide OpenWeatherClient used by the app and agent tools,
+    so they share one connection pool.
+    Raises ValueError (and caches nothing) if the API key isn't configured.
+    """
+    return OpenWeatherClient()
+
+
+async def aclose_default_clients() -> None:
+    """Close the default client's connection pool and forget it (app shutdown)."""
+    if get_default_openweather_client.cache_info().currsize:
+        await get_default_openweather_client().aclose()
+    get_default_openweather_client.cache_clear()
+
+
+class _TTLCache:
+    """Small LRU cache whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            # Stale: drop it so the caller refetches
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            # Evict the least recently used entry
+            self._data.popitem(last=False)
 
 
 class OpenWeatherClient:
@@ -12,41 +80,55 @@ class OpenWeatherClient:
     Minimal OpenWeather HTTP client with retries and timeouts.
     - Uses API key from env (.env) via settings.py
     - Exposes raw-JSON helpers for Geocoding and Current Weather
+    - Owns its own connection pool unless an httpx client is injected
+      (e.g. one with a mock transport in tests); share a pool via
+      get_default_openweather_client()
     """
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         *,
+        client: Optional[httpx.AsyncClient] = None,
         base_url: str = "https://api.openweathermap.org",
         timeout_seconds: float = 10.0,
         max_retries: int = 3,
         backoff_factor: float = 0.5,
+        retry_budget_seconds: float = 30.0,
+        geocode_ttl_seconds: float = 24 * 60 * 60,
+        weather_ttl_seconds: float = 60.0,
     ) -> None:
         # Pull settings once and resolve API key:
         # 1) explicit api_key param, else
         # 2) settings.weather_api_key from env/.env
-        settings = Settings()
+        settings = get_settings()
         self.api_key = api_key or settings.weather_api_key
         if not self.api_key:
             # Fail fast at startup if key is missing
             raise ValueError("OpenWeather API key not configured (weather_api_key).")
 
-        # Normalize base URL and store retry/backoff config
+        # Normalize base URL and store timeout/retry/backoff config
         self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout_seconds)
         self.max_retries = max(1, max_retries)
         self.backoff_factor = backoff_factor
+        self.retry_budget_seconds = retry_budget_seconds
+
+        # City -> coordinates is effectively static, so keep it for a day.
+        # Current weather only updates every ~10 minutes upstream, so a short
+        # cache absorbs repeat questions about the same place.
+        self._geocode_cache = _TTLCache(maxsize=4096, ttl=geocode_ttl_seconds)
+        self._weather_cache = _TTLCache(maxsize=1024, ttl=weather_ttl_seconds)
 
-        # Single reusable HTTP client with connection pooling and a global timeout
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(timeout_seconds),
-            headers={"User-Agent": "weather-info-agent/0.1"},
-        )
+        # Injected clients belong to the caller; otherwise this instance owns
+        # its pool and closes it in aclose()
+        self._owns_client = client is None
+        self._client = _build_http_client() if client is None else client
 
     async def aclose(self) -> None:
         # Explicitly close the underlying HTTP client (important on shutdown)
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     async def __aenter__(self) -> "OpenWeatherClient":
         # Enable "async with OpenWeatherClient() as ow:"
@@ -57,28 +139,39 @@ class OpenWeatherClient:
         await self.aclose()
 
     async def _get(self, path: str, params: Dict[str, Any]) -> Any:
-        """GET with minimal retries, honoring 429 Retry-After when present."""
+        """
+        GET with minimal retries, honoring 429 Retry-After when present.
+        Retries stop once retry_budget_seconds have elapsed since the first attempt.
+        """
         # Always include the OpenWeather appid (API key)
         qp = dict(params or {})
         qp["appid"] = self.api_key
 
+        deadline = time.monotonic() + self.retry_budget_seconds
         attempt = 0
         last_exc: Optional[Exception] = None
 
         while attempt < self.max_retries:
             attempt += 1
             try:
-                # Perform the HTTP GET; base_url joins with path
-                resp = await self._client.get(path, params=qp)
+                # Perform the HTTP GET against base_url + path
+                resp = await self._client.get(self.base_url + path, params=qp, timeout=self.timeout)
 
-                print(resp.url)
+                logger.debug("url=%s status=%s", resp.url, resp.status_code)
 
                 # Retry on rate limits (429) and server errors (5xx)
                 if resp.status_code in (429,) or 500 <= resp.status_code < 600:
-                    delay = self._compute_delay(attempt, resp)
                     if attempt < self.max_retries:
-                        await asyncio.sleep(delay)
-                        continue
+                        delay = self._compute_delay(attempt, resp)
+                        remaining = deadline - time.monotonic()
+                        if resp.status_code != 429:
+                            # Plain backoff for 5xx can be shortened to fit the budget
+                            delay = min(delay, remaining)
+                        # A 429 wait (honoring Retry-After) that outlasts the budget
+                        # can't succeed in time, so give up now instead of retrying early
+                        if 0 < delay <= remaining:
+                            await asyncio.sleep(delay)
+                            continue
 
                 # Raise for 4xx/5xx that we aren't retrying anymore
                 resp.raise_for_status()
@@ -90,9 +183,11 @@ class OpenWeatherClient:
                 # Network/transient transport errors: retry with backoff
                 last_exc = e
                 if attempt < self.max_retries:
-                    await asyncio.sleep(self._compute_delay(attempt))
-                    continue
-                # Out of retries: bubble up the last transport error
+                    delay = min(self._compute_delay(attempt), deadline - time.monotonic())
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                        continue
+                # Out of retries or time: bubble up the last transport error
                 raise
 
             except httpx.HTTPStatusError:
@@ -105,8 +200,9 @@ class OpenWeatherClient:
         raise RuntimeError("OpenWeather request failed without an exception.")
 
     def _compute_delay(self, attempt: int, resp: Optional[httpx.Response] = None) -> float:
-        # Simple exponential backoff: factor * 2^(attempt-1)
-        base = self.backoff_factor * (2 ** (attempt - 1))
+        # Exponential backoff, factor * 2^(attempt-1), with equal jitter so
+        # concurrent callers hitting the same 429 don't retry in lockstep
+        base = _jitter.uniform(0.5, 1.0) * self.backoff_factor * (2 ** (attempt - 1))
 
         # If rate limited (429) and server provided Retry-After, respect it
         if resp is not None and resp.status_code == 429:
@@ -132,11 +228,22 @@ class OpenWeatherClient:
         OpenWeather Geocoding API (Direct).
         Returns a list of place candidates (raw JSON).
         """
+        # Normalize the query so "Paris" and " paris " share a cache entry
+        q = q.strip()
+        key = (q.lower(), limit, lang)
+        cached = self._geocode_cache.get(key)
+        if cached is not None:
+            return cached
+
         # Build query params and call the internal GET helper
         params: Dict[str, Any] = {"q": q, "limit": limit}
         if lang:
             params["lang"] = lang
-        return await self._get("/geo/1.0/direct", params)
+        results = await self._get("/geo/1.0/direct", params)
+        # Don't cache misses; they are often typos the user will correct
+        if results:
+            self._geocode_cache.set(key, results)
+        return results
 
     async def current_weather(
         self,
@@ -150,11 +257,19 @@ class OpenWeatherClient:
         OpenWeather Current Weather Data (One location).
         Returns the current weather object (raw JSON).
         """
+        # Coordinates rounded to ~1 km so nearby lookups share an entry
+        key = (round(lat, 2), round(lon, 2), units, lang)
+        cached = self._weather_cache.get(key)
+        if cached is not None:
+            return cached
+
         # Build query params with coordinates and optional localization
         params: Dict[str, Any] = {"lat": lat, "lon": lon, "units": units}
         if lang:
             params["lang"] = lang
-        return await self._get("/data/2.5/weather", params)
+        data = await self._get("/data/2.5/weather", params)
+        self._weather_cache.set(key, data)
+        return data
     
 
     async def forecast_5day(
@@ -1,35 +1,44 @@
 # main.py
+import logging
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 import httpx
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from agents.weather_agent import WeatherAgent
+from agents.weather_agent import MAX_BATCH_SIZE, WeatherAgent
 from models.chat import ChatRequest, ChatResponse
-from settings import Settings
-from clients.openWeatherAPI import OpenWeatherClient
+from settings import get_settings
+from clients.openWeatherAPI import (
+    OpenWeatherClient,
+    aclose_default_clients,
+    get_default_openweather_client,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.settings = Settings()
+    app.state.settings = get_settings()
+    logging.basicConfig(level=app.state.settings.log_level)
     app.state.agent = WeatherAgent()
-    # Try to create and reuse a single client (connection pooling)
+    # Reuse the process-wide client (shared with the agent tools)
     try:
-        app.state.ow = OpenWeatherClient()
+        app.state.ow = get_default_openweather_client()
     except ValueError:
         # API key not set yet; endpoints will surface a clear 500
         app.state.ow = None
     yield
-    if app.state.ow:
-        await app.state.ow.aclose()
+    await aclose_default_clients()
 
 
 app = FastAPI(
     title="Weather Info Agent API",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -73,18 +82,21 @@ async def current_weather(
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, req: Request):
+async def chat(request: ChatRequest, req: Request, res: Response):
     """
     Chat endpoint that processes user queries about weather.
     The agent will automatically call tools when needed.
+    Token usage is reported in the X-Input-Tokens / X-Output-Tokens headers.
     """
     agent: WeatherAgent = req.app.state.agent
     
     # Invoke the agent with the user's message
-    print("message from route:", request.message)
-    response = await agent.invoke(request.message)
+    logger.debug("message from route: %s", request.message)
+    response, usage = await agent.invoke(request.message)
 
-    print("response from route:", response)
+    logger.debug("response from route: %s", response)
+    res.headers["X-Input-Tokens"] = str(usage["input_tokens"])
+    res.headers["X-Output-Tokens"] = str(usage["output_tokens"])
     
     return ChatResponse(
         response=str(response.content),
@@ -92,6 +104,49 @@ async def chat(request: ChatRequest, req: Request):
     )
 
 
+@app.post("/chat/batch", response_model=List[ChatResponse])
+async def chat_batch(requests: List[ChatRequest], req: Request):
+    """
+    Batch chat endpoint: processes several independent messages together.
+    Responses are returned in request order.
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: at most {MAX_BATCH_SIZE} messages per request."
+        )
+    
+    agent: WeatherAgent = req.app.state.agent
+    
+    responses = await agent.ainvoke_batch([r.message for r in requests])
+    
+    return [
+        ChatResponse(
+            response=str(response.content),
+            conversation_id=request.conversation_id
+        )
+        for request, response in zip(requests, responses)
+    ]
+
+
+async def _sse(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    # Server-Sent Events framing: one "data:" line per text line, blank line per event
+    async for chunk in chunks:
+        yield "".join(f"data: {line}\n" for line in chunk.split("\n")) + "\n"
+    yield "event: end\ndata: \n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, req: Request):
+    """
+    Streaming chat endpoint: same as /chat, but the answer is sent as
+    Server-Sent Events while it is generated.
+    """
+    agent: WeatherAgent = req.app.state.agent
+    
+    return StreamingResponse(_sse(agent.astream(request.message)), media_type="text/event-stream")
+
+
 if __name__ == "__main__":
     import uvicorn
 
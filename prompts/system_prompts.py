@@ -4,20 +4,18 @@ System prompts for different tool contexts.
 These guide the LLM on how to interpret and use tool outputs.
 """
 
+_DEFAULT_TOOL_PROMPT = "Process the tool result and provide a helpful response to the user."
+
+# Kept short and static: these are folded into the agent's system prompt once,
+# so the prompt prefix stays byte-identical across turns.
 TOOL_SYSTEM_PROMPTS = {
-    "city_to_coords": """You have received geographic coordinates for a location.
-Use these coordinates to fetch weather data if needed.
-If the location was not found (error field present), politely ask the user to provide a more specific city name or verify the spelling.""",
+    "city_to_coords": "city_to_coords: use the coordinates for follow-up weather lookups. On error, ask the user for a more specific or correctly spelled city.",
+
+    "get_current_weather": "get_current_weather: lead with temperature and condition; mention feels-like if notably different, plus wind and humidity when relevant. On error, say data is temporarily unavailable.",
 
-    "get_current_weather": """You have received current weather data for a location.
-Present this information in a clear, conversational way:
-- Lead with the current temperature and condition
-- Mention feels-like temperature if significantly different
-- Include wind speed and humidity when relevant
-- Use appropriate units based on the data provided
-- Keep the response concise but informative
+    "get_weather_for_city": "get_weather_for_city: name the resolved location, then lead with temperature and condition; mention feels-like if notably different, plus wind and humidity when relevant. On error, ask the user to verify the city or try again later.",
 
-If there's an error field, inform the user that weather data is temporarily unavailable and suggest trying again.""",
+    "get_forecast": "get_forecast: summarize the trend for the requested timeframe, highlighting precipitation chance and temperature range. On error or empty entries, say the forecast is unavailable.",
 }
 
 
@@ -26,7 +24,4 @@ def get_tool_prompt(tool_name: str) -> str:
     Get the system prompt for a specific tool.
     Returns a generic prompt if tool-specific prompt not found.
     """
-    return TOOL_SYSTEM_PROMPTS.get(
-        tool_name,
-        "Process the tool result and provide a helpful response to the user."
-    )
+    return TOOL_SYSTEM_PROMPTS.get(tool_name, _DEFAULT_TOOL_PROMPT)
@@ -22,3 +22,9 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env"
     )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # Parse .env once per process instead of on every call site
+    return Settings()
@@ -1,9 +1,12 @@
+from bisect import bisect_left, bisect_right
 from typing import Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from langchain_core.tools import tool
-from clients.openWeatherAPI import OpenWeatherClient
-from settings import Settings
-import pytz
+from clients.openWeatherAPI import get_default_openweather_client
+from tools.payload import UNIT_SUFFIXES, compact, round_or_none
+from settings import get_settings
+
+DEFAULT_LANG = get_settings().default_lang
 
 
 @tool
@@ -12,46 +15,44 @@ async def get_forecast(lat: float, lon: float, timeframe: str = "tomorrow", unit
     Get weather forecast for a specific timeframe.
     
     Args:
-        lat: Latitude of the location
-        lon: Longitude of the location
-        timeframe: Time period - "tonight", "tomorrow", "weekend", or "next_3_days"
-        units: Unit system - "metric" (Celsius), "imperial" (Fahrenheit), or "standard" (Kelvin)
-    
-    Returns:
-        A dictionary with filtered forecast data for the requested timeframe
-    
-    Assumptions:
-    - "tonight": 6 PM today to 6 AM tomorrow (local time approximation using UTC)
-    - "tomorrow": Next calendar day (midnight to midnight)
-    - "weekend": Next Saturday and Sunday
-    - "next_3_days": Next 72 hours from now
-    - Forecast data is in 3-hour intervals
-    
-    Edge cases:
-    - If it's already past midnight, "tonight" may return empty results
-    - Weekend calculation assumes Saturday-Sunday; may vary by culture
-    - API provides max 5 days; requests beyond that return all available data
-    - Timezone is approximated; actual local time may differ
+        lat: Latitude
+        lon: Longitude
+        timeframe: "tonight", "tomorrow", "weekend", or "next_3_days"
+        units: "metric", "imperial", or "standard"
     """
+    # Assumptions (kept out of the docstring, which is sent to the LLM every turn):
+    # - "tonight": 6 PM today to 6 AM tomorrow (local time approximation using UTC)
+    # - "tomorrow": Next calendar day (midnight to midnight)
+    # - "weekend": Next Saturday and Sunday
+    # - "next_3_days": Next 72 hours from now
+    # - Forecast data is in 3-hour intervals
+    #
+    # Edge cases:
+    # - If it's already past midnight, "tonight" may return empty results
+    # - Weekend calculation assumes Saturday-Sunday; may vary by culture
+    # - API provides max 5 days; requests beyond that return all available data
+    # - Timezone is approximated; actual local time may differ
     try:
-        async with OpenWeatherClient() as client:
-            raw = await client.forecast_5day(
-                lat=lat,
-                lon=lon,
-                units=units,
-                lang=Settings().default_lang
-            )
+        client = get_default_openweather_client()
+        raw = await client.forecast_5day(
+            lat=lat,
+            lon=lon,
+            units=units,
+            lang=DEFAULT_LANG
+        )
         
         forecast_list = raw.get("list", [])
         if not forecast_list:
             return {"error": "No forecast data available", "entries": []}
         
-        # Determine unit suffix
-        temp_unit = "°C" if units == "metric" else "°F" if units == "imperial" else "K"
+        # Units are encoded in the field names (temp_c, wind_ms, ...)
+        temp_suffix, wind_suffix = UNIT_SUFFIXES.get(units, UNIT_SUFFIXES["standard"])
         
-        # Filter based on timeframe
-        now = datetime.utcnow()
-        filtered_entries = []
+        # Filter based on timeframe. OpenWeather returns entries sorted by
+        # "dt", so each window is a contiguous slice found by binary search
+        # on the unix timestamps.
+        dts = [entry["dt"] for entry in forecast_list]
+        now = datetime.now(tz=timezone.utc)
         
         if timeframe == "tonight":
             # Tonight: 6 PM today to 6 AM tomorrow (UTC approximation)
@@ -61,20 +62,16 @@ async def get_forecast(lat: float, lon: float, timeframe: str = "tomorrow", unit
                 tonight_start = now
             tonight_end = (now + timedelta(days=1)).replace(hour=6, minute=0, second=0, microsecond=0)
             
-            filtered_entries = [
-                entry for entry in forecast_list
-                if tonight_start <= datetime.fromtimestamp(entry["dt"]) <= tonight_end
-            ]
+            i = bisect_left(dts, tonight_start.timestamp())
+            j = bisect_right(dts, tonight_end.timestamp())
         
         elif timeframe == "tomorrow":
             # Tomorrow: next calendar day
             tomorrow_start = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
             tomorrow_end = tomorrow_start + timedelta(days=1)
             
-            filtered_entries = [
-                entry for entry in forecast_list
-                if tomorrow_start <= datetime.fromtimestamp(entry["dt"]) < tomorrow_end
-            ]
+            i = bisect_left(dts, tomorrow_start.timestamp())
+            j = bisect_left(dts, tomorrow_end.timestamp())
         
         elif timeframe == "weekend":
             # Next Saturday and Sunday
@@ -86,18 +83,16 @@ async def get_forecast(lat: float, lon: float, timeframe: str = "tomorrow", unit
             weekend_start = (now + timedelta(days=days_until_saturday)).replace(hour=0, minute=0, second=0, microsecond=0)
             weekend_end = weekend_start + timedelta(days=2)
             
-            filtered_entries = [
-                entry for entry in forecast_list
-                if weekend_start <= datetime.fromtimestamp(entry["dt"]) < weekend_end
-            ]
+            i = bisect_left(dts, weekend_start.timestamp())
+            j = bisect_left(dts, weekend_end.timestamp())
         
         else:  # "next_3_days" or default
             # Next 72 hours
             end_time = now + timedelta(hours=72)
-            filtered_entries = [
-                entry for entry in forecast_list
-                if datetime.fromtimestamp(entry["dt"]) <= end_time
-            ]
+            i = 0
+            j = bisect_right(dts, end_time.timestamp())
+        
+        filtered_entries = forecast_list[i:j]
         
         # Normalize entries
         normalized = []
@@ -106,21 +101,18 @@ async def get_forecast(lat: float, lon: float, timeframe: str = "tomorrow", unit
             weather = entry.get("weather", [{}])[0]
             wind = entry.get("wind", {})
             
-            normalized.append({
-                "datetime": datetime.fromtimestamp(entry["dt"]).isoformat(),
-                "timestamp": entry["dt"],
-                "temp": main.get("temp"),
-                "temp_unit": temp_unit,
-                "feels_like": main.get("feels_like"),
-                "temp_min": main.get("temp_min"),
-                "temp_max": main.get("temp_max"),
-                "condition": weather.get("main", "Unknown"),
-                "description": weather.get("description", ""),
-                "precipitation_prob": entry.get("pop", 0) * 100,  # Convert to percentage
-                "wind_speed": wind.get("speed"),
+            normalized.append(compact({
+                "datetime": datetime.fromtimestamp(entry["dt"], tz=timezone.utc).isoformat(),
+                f"temp_{temp_suffix}": round_or_none(main.get("temp")),
+                f"feels_like_{temp_suffix}": round_or_none(main.get("feels_like")),
+                f"temp_min_{temp_suffix}": round_or_none(main.get("temp_min")),
+                f"temp_max_{temp_suffix}": round_or_none(main.get("temp_max")),
+                "description": weather.get("description") or weather.get("main"),
+                "precipitation_prob": round(entry.get("pop", 0) * 100),  # Convert to percentage
+                f"wind_{wind_suffix}": round_or_none(wind.get("speed")),
                 "humidity": main.get("humidity"),
                 "clouds": entry.get("clouds", {}).get("all"),
-            })
+            }))
         
         return {
             "timeframe": timeframe,
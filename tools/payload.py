@@ -0,0 +1,28 @@
+# tools/payload.py
+"""
+Helpers for keeping tool results small.
+Tool results are sent back to the LLM as input tokens on the next turn,
+so empty fields are dropped and numbers are rounded.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Values that carry no information for the LLM
+_EMPTY = (None, "", "Unknown")
+
+# OpenWeather unit system -> (temperature, wind speed) field-name suffixes
+UNIT_SUFFIXES: Mapping[str, Tuple[str, str]] = MappingProxyType({
+    "metric": ("c", "ms"),
+    "imperial": ("f", "mph"),
+    "standard": ("k", "ms"),
+})
+
+
+def compact(out: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop keys whose value is None, an empty string, or "Unknown"."""
+    return {k: v for k, v in out.items() if v not in _EMPTY}
+
+
+def round_or_none(value: Optional[float], ndigits: Optional[int] = 1) -> Optional[float]:
+    """Round a numeric field, passing missing values through."""
+    return None if value is None else round(value, ndigits)
@@ -1,76 +1,56 @@
 # tools/weather_tools.py
+import logging
 from typing import Dict, Any
 from langchain_core.tools import tool
-from clients.openWeatherAPI import OpenWeatherClient
-from settings import Settings
+from clients.openWeatherAPI import get_default_openweather_client
+from tools.payload import UNIT_SUFFIXES, compact, round_or_none
+from settings import get_settings
 
+logger = logging.getLogger(__name__)
 
-@tool
-async def city_to_coords(city: str) -> Dict[str, Any]:
-    """
-    Convert a city name to geographic coordinates.
+# Resolved once at import; settings don't change for the life of the process
+DEFAULT_LANG = get_settings().default_lang
+
+
+async def _geocode(city: str) -> Dict[str, Any]:
+    # Shared by city_to_coords and get_weather_for_city
+    logger.debug("city from tool: %s", city)
     
-    Args:
-        city: The name of the city to geocode (e.g., "Paris", "New York, US", "Tokyo, Japan")
+    client = get_default_openweather_client()
+    results = await client.geocode_direct(
+        q=city,
+        limit=1,
+        lang=DEFAULT_LANG
+    )
     
-    Returns:
-        A dictionary with lat, lon, and normalized_name
-    """
-    settings = Settings()
-
-    print("city from tool:", city)
+    if not results:
+        return {"error": f"Could not find coordinates for '{city}'"}
     
-    async with OpenWeatherClient() as client:
-        results = await client.geocode_direct(
-            q=city,
-            limit=1,
-            lang=settings.default_lang
-        )
-        
-        if not results:
-            return {
-                "error": f"Could not find coordinates for '{city}'",
-                "lat": None,
-                "lon": None,
-                "normalized_name": None
-            }
-        
-        place = results[0]
-        normalized_name = place.get("name", "")
-        if place.get("state"):
-            normalized_name += f", {place['state']}"
-        if place.get("country"):
-            normalized_name += f", {place['country']}"
-        
-        return {
-            "lat": place["lat"],
-            "lon": place["lon"],
-            "normalized_name": normalized_name
-        }
+    place = results[0]
+    normalized_name = place.get("name", "")
+    if place.get("state"):
+        normalized_name += f", {place['state']}"
+    if place.get("country"):
+        normalized_name += f", {place['country']}"
+    
+    return {
+        "lat": place["lat"],
+        "lon": place["lon"],
+        "normalized_name": normalized_name
+    }
 
 
-@tool
-async def get_current_weather(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
-    """
-    Get current weather conditions for specific coordinates.
-    
-    Args:
-        lat: Latitude of the location
-        lon: Longitude of the location
-        units: Unit system - "metric" (Celsius), "imperial" (Fahrenheit), or "standard" (Kelvin)
-    
-    Returns:
-        A dictionary with normalized weather data including temperature, feels_like, condition, wind, humidity, and clouds
-    """
-    print("lat from weather tool:", lat)
+async def _current_weather(lat: float, lon: float, units: str) -> Dict[str, Any]:
+    # Shared by get_current_weather and get_weather_for_city
+    logger.debug("coords from weather tool: lat=%s lon=%s", lat, lon)
     try:
-        async with OpenWeatherClient() as client:
-            raw = await client.current_weather(
-                lat=lat,
-                lon=lon,
-                units=units,
-                lang=Settings().default_lang
-            )
+        client = get_default_openweather_client()
+        raw = await client.current_weather(
+            lat=lat,
+            lon=lon,
+            units=units,
+            lang=DEFAULT_LANG
+        )
         
         # Normalize response
         main = raw.get("main", {})
@@ -78,33 +58,65 @@ async def get_current_weather(lat: float, lon: float, units: str = "metric") ->
         wind = raw.get("wind", {})
         clouds = raw.get("clouds", {})
         
-        # Determine unit suffix
-        temp_unit = "°C" if units == "metric" else "°F" if units == "imperial" else "K"
-        wind_unit = "m/s" if units == "metric" else "mph" if units == "imperial" else "m/s"
+        # Units are encoded in the field names (temp_c, wind_ms, ...)
+        temp_suffix, wind_suffix = UNIT_SUFFIXES.get(units, UNIT_SUFFIXES["standard"])
         
-        return {
-            "temp": main.get("temp"),
-            "temp_unit": temp_unit,
-            "feels_like": main.get("feels_like"),
-            "condition": weather.get("main", "Unknown"),
-            "description": weather.get("description", ""),
-            "wind_speed": wind.get("speed"),
-            "wind_unit": wind_unit,
+        return compact({
+            f"temp_{temp_suffix}": round_or_none(main.get("temp")),
+            f"feels_like_{temp_suffix}": round_or_none(main.get("feels_like")),
+            # description is the more specific of the two (e.g. "light rain" vs "Rain")
+            "description": weather.get("description") or weather.get("main"),
+            f"wind_{wind_suffix}": round_or_none(wind.get("speed")),
             "wind_deg": wind.get("deg"),
             "humidity": main.get("humidity"),
             "clouds": clouds.get("all"),
             "pressure": main.get("pressure"),
             "visibility": raw.get("visibility"),
-        }
+        })
         
     except Exception as e:
-        return {
-            "error": f"Failed to fetch weather data: {str(e)}",
-            "temp": None,
-            "feels_like": None,
-            "condition": None,
-            "description": None,
-            "wind_speed": None,
-            "humidity": None,
-            "clouds": None
-        }
\ No newline at end of file
+        return {"error": f"Failed to fetch weather data: {str(e)}"}
+
+
+@tool
+async def city_to_coords(city: str) -> Dict[str, Any]:
+    """
+    Convert a city name to geographic coordinates.
+    
+    Args:
+        city: City name, e.g. "Paris" or "New York, US"
+    """
+    return await _geocode(city)
+
+
+@tool
+async def get_current_weather(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
+    """
+    Get current weather conditions for specific coordinates.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        units: "metric", "imperial", or "standard"
+    """
+    return await _current_weather(lat, lon, units)
+
+
+@tool
+async def get_weather_for_city(city: str, units: str = "metric") -> Dict[str, Any]:
+    """
+    Get current weather conditions for a city in a single step.
+    
+    Args:
+        city: City name, e.g. "Paris" or "New York, US"
+        units: "metric", "imperial", or "standard"
+    """
+    try:
+        place = await _geocode(city)
+    except Exception as e:
+        return {"error": f"Failed to geocode '{city}': {str(e)}"}
+    if place.get("error"):
+        return place
+    
+    weather = await _current_weather(place["lat"], place["lon"], units)
+    return {**place, **weather}